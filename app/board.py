@@ -1,16 +1,139 @@
-import copy
-import pprint
-from typing import Optional, List, Dict, Final, Tuple
+import random
+from array import array
+from collections import OrderedDict
+from typing import (Callable, Optional, List, Dict, Final, MutableSequence,
+                    NamedTuple, Tuple)
 
+from app.magic import (BB_ALL, BISHOP_RAYS, ROOK_RAYS, bishop_attacks,
+                       rook_attacks)
 from app.move import Move
 
 
+# (row, col) coordinates of every square, so decoding a destination
+# bitboard into moves reuses these tuples instead of allocating new ones.
+SQUARES: Final[List[Tuple[int, int]]] = [divmod(sq, 8) for sq in range(64)]
+
+_ORD_A: Final[int] = ord('a')
+
+# File and rank masks. Row 5 is white's third rank and row 2 black's.
+FILE_A: Final[int] = 0x0101010101010101
+FILE_H: Final[int] = 0x8080808080808080
+RANK_3: Final[int] = 0x0000FF0000000000
+RANK_6: Final[int] = 0x0000000000FF0000
+
+# Conversions between ASCII piece characters and signed piece codes. The
+# code tables are indexed by ``code + 6``.
+_PIECE_FROM_CHAR: Final[Dict[str, int]] = {
+    '.': 0, 'P': 1, 'N': 2, 'B': 3, 'R': 4, 'Q': 5, 'K': 6,
+    'p': -1, 'n': -2, 'b': -3, 'r': -4, 'q': -5, 'k': -6
+}
+_CHAR_FROM_PIECE: Final[str] = 'kqrbnp.PNBRQK'
+_BB_INDEX: Final[List[int]] = [11, 10, 9, 8, 7, 6, -1, 0, 1, 2, 3, 4, 5]
+
+
+# Zobrist keys. A fixed seed keeps hashes stable between runs.
+_zobrist_rng = random.Random(0)
+ZOBRIST_PIECE: Final[List[List[int]]] = [
+    [_zobrist_rng.getrandbits(64) for _ in range(64)] for _ in range(12)]
+ZOBRIST_SIDE: Final[int] = _zobrist_rng.getrandbits(64)
+ZOBRIST_CASTLE: Final[List[int]] = [
+    _zobrist_rng.getrandbits(64) for _ in range(16)]
+ZOBRIST_EP: Final[List[int]] = [_zobrist_rng.getrandbits(64) for _ in range(64)]
+
+
+class _TTEntry:
+    """Cached results for one position in the transposition table.
+
+    Attributes:
+        attacks: Attack bitboards by color, None until computed.
+        moves: ``get_all_valid_moves`` results keyed by its flags.
+    """
+
+    __slots__ = ('attacks', 'moves')
+
+    def __init__(self) -> None:
+        self.attacks: List[Optional[int]] = [None, None]
+        self.moves: Dict[Tuple[bool, bool], Dict[
+            Tuple[int, int], Tuple[str, Tuple[Tuple[int, int], ...]]]] = {}
+
+
+class UndoInfo(NamedTuple):
+    """State needed to take back a ``Board.make_raw_move``.
+
+    Only what a raw move changes is recorded; turn, castling rights, en
+    passant and move clocks are untouched by it.
+
+    Attributes:
+        captured: Signed piece code that stood on the target square.
+        zobrist: Piece placement hash before the move.
+        attacks: Attack bitboard cache before the move.
+    """
+    captured: int
+    zobrist: int
+    attacks: List[Optional[int]]
+
+
+# Transposition table shared by all boards, least recently used first.
+TT_SIZE: Final[int] = 1 << 12
+TT: OrderedDict[int, _TTEntry] = OrderedDict()
+
+
+def _build_step_attacks(offsets: List[Tuple[int, int]]) -> List[int]:
+    """Build a per-square attack table for a piece with fixed step offsets.
+
+    Args:
+        offsets: (row, col) offsets the piece can step to.
+
+    Returns:
+        List[int]: 64 bitboards of the squares reachable from each square.
+    """
+    table = [0] * 64
+    for sq in range(64):
+        row, col = divmod(sq, 8)
+        for dr, dc in offsets:
+            nr, nc = row + dr, col + dc
+            if 0 <= nr < 8 and 0 <= nc < 8:
+                table[sq] |= 1 << (nr * 8 + nc)
+    return table
+
+
+KNIGHT_ATTACKS: Final[List[int]] = _build_step_attacks(
+    [(2, 1), (2, -1), (-2, 1), (-2, -1), (1, 2), (1, -2), (-1, 2), (-1, -2)])
+KING_ATTACKS: Final[List[int]] = _build_step_attacks(
+    [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)])
+# Indexed by color as a bool: PAWN_ATTACKS[True] holds white pawn attacks
+# and PAWN_PUSHES[True] the square one step ahead of a white pawn.
+PAWN_ATTACKS: Final[List[List[int]]] = [
+    _build_step_attacks([(1, -1), (1, 1)]),
+    _build_step_attacks([(-1, -1), (-1, 1)])
+]
+PAWN_PUSHES: Final[List[List[int]]] = [
+    _build_step_attacks([(1, 0)]),
+    _build_step_attacks([(-1, 0)])
+]
+
+
 class Board:
     """A class representing a chess board with Unicode piece representations.
 
+    The position is stored as twelve bitboards, one per piece type and
+    color, indexed by square ``row * 8 + col`` (square 0 is a8, square 63
+    is h1). A 64-square mailbox mirrors it with signed piece codes: the
+    magnitude is the piece type (``P`` ... ``K``) and the sign the color,
+    positive for white.
+
     Attributes:
         CHESS_SYMBOLS: Mapping of ASCII piece characters to Unicode symbols.
-        board: 2D list representing the chess board state.
+        bbs: Piece bitboards indexed by the ``WP`` ... ``BK`` constants.
+        mailbox: Signed piece code of each square, 0 when empty.
+        piece_squares: Squares occupied by each piece, indexed like ``bbs``,
+            in no particular order.
+        zobrist: Zobrist hash of the piece placement.
+        white_king_sq: Square of the white king, or -1 if absent.
+        black_king_sq: Square of the black king, or -1 if absent.
+        occupancy_white: Bitboard of all squares holding a white piece.
+        occupancy_black: Bitboard of all squares holding a black piece.
+        occupancy_all: Bitboard of all occupied squares.
         turn: Current player's turn ('white' or 'black').
         castling: Dictionary tracking castling availability.
         en_passant: Optional square where en passant capture is possible.
@@ -24,6 +147,36 @@ class Board:
         '.': '·'
     }
 
+    # Piece type codes, negated for black pieces in ``mailbox``.
+    EMPTY: Final[int] = 0
+    P: Final[int] = 1
+    N: Final[int] = 2
+    B: Final[int] = 3
+    R: Final[int] = 4
+    Q: Final[int] = 5
+    K: Final[int] = 6
+
+    # Bitboard indexes into ``bbs``.
+    WP: Final[int] = 0
+    WN: Final[int] = 1
+    WB: Final[int] = 2
+    WR: Final[int] = 3
+    WQ: Final[int] = 4
+    WK: Final[int] = 5
+    BP: Final[int] = 6
+    BN: Final[int] = 7
+    BB: Final[int] = 8
+    BR: Final[int] = 9
+    BQ: Final[int] = 10
+    BK: Final[int] = 11
+
+    # ASCII piece characters in bitboard index order.
+    PIECE_CHARS: Final[str] = 'PNBRQKpnbrqk'
+    PIECE_INDEX: Final[Dict[str, int]] = {
+        'P': WP, 'N': WN, 'B': WB, 'R': WR, 'Q': WQ, 'K': WK,
+        'p': BP, 'n': BN, 'b': BB, 'r': BR, 'q': BQ, 'k': BK
+    }
+
     def __init__(self, position: Optional[List[List[str]]] = None) -> None:
         """Initialize a new chess board.
 
@@ -31,13 +184,38 @@ class Board:
             position: Optional 2D list representing initial board state.
                      If None, uses standard chess starting position.
         """
-        self.board: List[List[str]] = position or self._default_board()
+        self.bbs: array = array('Q', [0] * 12)
+        self.mailbox: array = array('b', [0] * 64)
+        self.piece_squares: List[List[int]] = [[] for _ in range(12)]
+        self.zobrist: int = 0
+        cells = (cell for row in position or self._default_board()
+                 for cell in row)
+        for sq, cell in enumerate(cells):
+            code = _PIECE_FROM_CHAR[cell]
+            if code:
+                idx = _BB_INDEX[code + 6]
+                self.mailbox[sq] = code
+                self.bbs[idx] |= 1 << sq
+                self.piece_squares[idx].append(sq)
+                self.zobrist ^= ZOBRIST_PIECE[idx][sq]
+        self.white_king_sq: int = self.bbs[self.WK].bit_length() - 1
+        self.black_king_sq: int = self.bbs[self.BK].bit_length() - 1
+        self.occupancy_white: int = 0
+        self.occupancy_black: int = 0
+        for idx in range(6):
+            self.occupancy_white |= self.bbs[idx]
+            self.occupancy_black |= self.bbs[idx + 6]
+        self.occupancy_all: int = self.occupancy_white | self.occupancy_black
         self.white_turn: bool = True
         self.castling: Dict[str, bool] = {'K': True, 'Q': True, 'k': True,
                                           'q': True}
         self.white_in_check: bool = False
         self.black_in_check: bool = False
         self.en_passant: Optional[Tuple[int, int]] = None
+        # Destination squares written by the move generators.
+        self._move_buf: array = array('h', [0] * 64)
+        # Attack bitboards by color, cleared whenever a piece moves.
+        self._attacks: List[Optional[int]] = [None, None]
         self.halfmove_clock: int = 0
         self.fullmove_number: int = 1
 
@@ -59,6 +237,20 @@ class Board:
             ['R', 'N', 'B', 'Q', 'K', 'B', 'N', 'R']
         ]
 
+    @property
+    def board(self) -> List[List[str]]:
+        """2D list of piece characters, reconstructed from the bitboards.
+
+        The list is a fresh snapshot on every access, so writing to it does
+        not change the position; use ``make_raw_move`` or build a new
+        ``Board`` from the edited list instead.
+
+        Returns:
+            List[List[str]]: 2D list representing the current position.
+        """
+        return [[self.piece_at(row * 8 + col) for col in range(8)]
+                for row in range(8)]
+
     def __str__(self) -> str:
         """Generate Unicode representation of the board with coordinates.
 
@@ -86,7 +278,8 @@ class Board:
             str: String containing complete board state including position,
                  turn, castling rights, en passant, and move counts.
         """
-        board_str = ''.join(''.join(row) for row in self.board)
+        board_str = ''.join(_CHAR_FROM_PIECE[code + 6]
+                            for code in self.mailbox)
         return (f"<Board position='{board_str}' "
                 f"turn='{"white" if self.white_turn else "black"}' "
                 f"castling={self.castling} "
@@ -104,7 +297,19 @@ class Board:
         Returns:
             str: Character representing the piece at the position.
         """
-        return self.board[8 - rank][ord(file) - ord('a')]
+        return _CHAR_FROM_PIECE[
+            self.mailbox[(8 - rank) * 8 + ord(file) - _ORD_A] + 6]
+
+    def piece_at(self, sq: int) -> str:
+        """Get the piece on a square.
+
+        Args:
+            sq: Square index from 0 (a8) to 63 (h1).
+
+        Returns:
+            str: Character representing the piece, or '.' if empty.
+        """
+        return _CHAR_FROM_PIECE[self.mailbox[sq] + 6]
 
     def make_raw_move(self, move: Move) -> None:
         """Updates the board state by executing the given move.
@@ -115,54 +320,203 @@ class Board:
         Args:
             move: Move object containing source and target coordinates
         """
-        # Extract source and target coordinates
+        # Extract source and target squares
         src_row, src_col = move.source
         dst_row, dst_col = move.target
+        src_sq = src_row * 8 + src_col
+        dst_sq = dst_row * 8 + dst_col
+        if src_sq == dst_sq:
+            return  # nothing moves; the piece must not capture itself
+        src_bit = 1 << src_sq
+        dst_bit = 1 << dst_sq
+
+        mailbox = self.mailbox
+        code = mailbox[src_sq]
 
-        # Get the piece at the source square
-        piece = self.board[src_row][src_col]
+        # Remove any piece standing on the target square
+        captured = _BB_INDEX[mailbox[dst_sq] + 6]
+        if captured >= 0:
+            self.bbs[captured] ^= dst_bit
+            self.piece_squares[captured].remove(dst_sq)
+            self.zobrist ^= ZOBRIST_PIECE[captured][dst_sq]
+            if captured < 6:
+                self.occupancy_white ^= dst_bit
+            else:
+                self.occupancy_black ^= dst_bit
+            if captured == self.WK:
+                self.white_king_sq = -1
+            elif captured == self.BK:
+                self.black_king_sq = -1
 
         # Move the piece to the target square
-        self.board[src_row][src_col] = '.'
-        self.board[dst_row][dst_col] = piece
+        mailbox[src_sq] = self.EMPTY
+        mailbox[dst_sq] = code
+        piece = _BB_INDEX[code + 6]
+        if piece >= 0:
+            self.bbs[piece] ^= src_bit | dst_bit
+            squares = self.piece_squares[piece]
+            squares.remove(src_sq)
+            squares.append(dst_sq)
+            self.zobrist ^= ZOBRIST_PIECE[piece][src_sq] ^ \
+                ZOBRIST_PIECE[piece][dst_sq]
+            if piece < 6:
+                self.occupancy_white ^= src_bit | dst_bit
+            else:
+                self.occupancy_black ^= src_bit | dst_bit
+            if piece == self.WK:
+                self.white_king_sq = dst_sq
+            elif piece == self.BK:
+                self.black_king_sq = dst_sq
+
+        self.occupancy_all = self.occupancy_white | self.occupancy_black
+        self._attacks = [None, None]
+
+    def make_raw_move_with_undo(self, move: Move) -> UndoInfo:
+        """Execute a raw move and return what is needed to take it back.
+
+        Args:
+            move: Move object containing source and target coordinates
+
+        Returns:
+            UndoInfo: State to pass to ``unmake`` with the same move.
+        """
+        dst_row, dst_col = move.target
+        undo = UndoInfo(self.mailbox[dst_row * 8 + dst_col], self.zobrist,
+                        self._attacks)
+        self.make_raw_move(move)
+        return undo
+
+    def unmake(self, move: Move, undo: UndoInfo) -> None:
+        """Take back a move made with ``make_raw_move_with_undo``.
+
+        Args:
+            move: The move that was made.
+            undo: The state returned when the move was made.
+        """
+        src_row, src_col = move.source
+        dst_row, dst_col = move.target
+        src_sq = src_row * 8 + src_col
+        dst_sq = dst_row * 8 + dst_col
+        if src_sq == dst_sq:
+            return  # make_raw_move left the board untouched
+        src_bit = 1 << src_sq
+        dst_bit = 1 << dst_sq
+
+        mailbox = self.mailbox
+        code = mailbox[dst_sq]
+        mailbox[src_sq] = code
+        mailbox[dst_sq] = undo.captured
+
+        # Move the piece back to the source square
+        piece = _BB_INDEX[code + 6]
+        if piece >= 0:
+            self.bbs[piece] ^= src_bit | dst_bit
+            squares = self.piece_squares[piece]
+            squares.remove(dst_sq)
+            squares.append(src_sq)
+            if piece < 6:
+                self.occupancy_white ^= src_bit | dst_bit
+            else:
+                self.occupancy_black ^= src_bit | dst_bit
+            if piece == self.WK:
+                self.white_king_sq = src_sq
+            elif piece == self.BK:
+                self.black_king_sq = src_sq
+
+        # Restore the captured piece
+        captured = _BB_INDEX[undo.captured + 6]
+        if captured >= 0:
+            self.bbs[captured] ^= dst_bit
+            self.piece_squares[captured].append(dst_sq)
+            if captured < 6:
+                self.occupancy_white ^= dst_bit
+            else:
+                self.occupancy_black ^= dst_bit
+            if captured == self.WK:
+                self.white_king_sq = dst_sq
+            elif captured == self.BK:
+                self.black_king_sq = dst_sq
+
+        self.occupancy_all = self.occupancy_white | self.occupancy_black
+        self.zobrist = undo.zobrist
+        self._attacks = undo.attacks
+
+    def zobrist_key(self) -> int:
+        """Get the Zobrist hash of the full position.
+
+        Side to move, castling rights and the en passant square are folded
+        into the incrementally maintained piece hash on each call.
+
+        Returns:
+            int: 64-bit hash of the position.
+        """
+        castling = self.castling
+        rights = (castling.get('K', False) | castling.get('Q', False) << 1 |
+                  castling.get('k', False) << 2 | castling.get('q', False) << 3)
+        key = self.zobrist ^ ZOBRIST_CASTLE[rights]
+        if self.white_turn:
+            key ^= ZOBRIST_SIDE
+        if self.en_passant:
+            ep_row, ep_col = self.en_passant
+            key ^= ZOBRIST_EP[ep_row * 8 + ep_col]
+        return key
+
+    def _tt_entry(self) -> _TTEntry:
+        """Get the transposition table entry of the current position.
+
+        A new entry is inserted on a miss, evicting the least recently used
+        entry once the table holds ``TT_SIZE`` positions.
+
+        Returns:
+            _TTEntry: The entry for this position.
+        """
+        key = self.zobrist_key()
+        entry = TT.get(key)
+        if entry is None:
+            entry = TT[key] = _TTEntry()
+            if len(TT) > TT_SIZE:
+                TT.popitem(last=False)
+        else:
+            TT.move_to_end(key)
+        return entry
 
     def make_move(self, move: Move) -> None:
 
         # Extract source and target coordinates
         src_row, src_col = move.source
         dst_row, dst_col = move.target
+        piece = self.mailbox[src_row * 8 + src_col]
+        ptype = abs(piece)
 
         # Checking if move is valid
-        valid_moves = self.get_valid_moves(move.source)
-        if move.target not in valid_moves or self.board[src_row][
-            src_col] == '.' or self.board[src_row][
-            src_col].isupper() != self.white_turn:
+        if piece == self.EMPTY or (piece > 0) != self.white_turn or \
+                move.target not in self.get_valid_moves(move.source):
             raise ValueError(f"Invalid move: {move}. ")
 
+        # Captures must be detected before the target square is overwritten
+        is_capture = self.mailbox[dst_row * 8 + dst_col] != self.EMPTY
+
         # Setting en passant target
         pawn_start_row = 6 if self.white_turn else 1
         pawn_two_move_row = 4 if self.white_turn else 3
-        if self.board[src_row][
-            src_col].upper() == 'P' and src_row == pawn_start_row and dst_row == pawn_two_move_row:
+        if ptype == self.P and src_row == pawn_start_row and \
+                dst_row == pawn_two_move_row:
             self.en_passant = (
                 src_row - 1 if self.white_turn else src_row + 1, src_col)
         else:
             self.en_passant = None
 
         # Verifying castling rights
-        king_pos = self.find('K')[0] if self.white_turn else self.find('k')[0]
-        if king_pos == move.source:
+        if ptype == self.K:
             self.castling['K' if self.white_turn else 'k'] = False
             self.castling['Q' if self.white_turn else 'q'] = False
 
         queen_rook_pos = (7, 0) if self.white_turn else (0, 0)
-        if self.board[src_row][
-            src_col].upper() == 'R' and move.source == queen_rook_pos:
+        if ptype == self.R and move.source == queen_rook_pos:
             self.castling['Q' if self.white_turn else 'q'] = False
 
         king_rook_pos = (7, 7) if self.white_turn else (0, 7)
-        if self.board[src_row][
-            src_col].upper() == 'R' and move.source == king_rook_pos:
+        if ptype == self.R and move.source == king_rook_pos:
             self.castling['K' if self.white_turn else 'k'] = False
 
         # Applying the move
@@ -175,8 +529,7 @@ class Board:
             self.black_in_check = False
 
         # Set the half move clock
-        if self.board[src_row][src_col].upper() == 'P' or \
-                self.board[dst_row][dst_col].upper() != '.':
+        if ptype == self.P or is_capture:
             self.halfmove_clock = 0
         else:
             self.halfmove_clock += 1
@@ -222,235 +575,530 @@ class Board:
         Returns:
             List[Tuple[int, int]]: List of destination (row, col) coordinates.
         """
-        moves: List[Tuple[int, int]] = []
+        return [SQUARES[dst] for dst in self.get_valid_move_squares(
+            pos, attack_moves_only, validate_pin)]
+
+    def get_valid_move_squares(
+            self, pos: Tuple[int, int],
+            attack_moves_only: bool = False,
+            validate_pin: bool = True
+    ) -> memoryview:
+        """Get the valid moves of a piece as square indexes.
+
+        Same as ``get_valid_moves`` but without building (row, col) tuples.
+        The view is backed by a buffer shared by all move generation on this
+        board, so it is only valid until the next such call.
+
+        Args:
+            pos: The (row, col) coordinate of the piece.
+            attack_moves_only: See ``get_valid_moves``.
+            validate_pin: See ``get_valid_moves``.
+
+        Returns:
+            memoryview: Destination square indexes (``row * 8 + col``).
+        """
         row, col = pos
-        piece = self.board[row][col]
-        if piece == '.':
-            return moves  # no piece at this position
+        code = self.mailbox[row * 8 + col]
+        if code == self.EMPTY:
+            return memoryview(self._move_buf)[:0]  # no piece at this position
+        n = self._moves_from(row * 8 + col, code, attack_moves_only,
+                             validate_pin)
+        return memoryview(self._move_buf)[:n]
+
+    def _moves_from(self, sq: int, code: int, attack_moves_only: bool,
+                    validate_pin: bool) -> int:
+        """Generate the moves of a known piece into the move buffer.
+
+        Args:
+            sq: Square index of the piece.
+            code: Signed piece code of the piece on ``sq``.
+            attack_moves_only: If True, only return capturing moves.
+            validate_pin: If True, filter out moves that leave the king in
+                check.
+
+        Returns:
+            int: Number of destination squares written to ``_move_buf``.
+        """
+        # Determine side: white piece codes are positive, black negative.
+        is_white = code > 0
+        ptype = code if is_white else -code
+        n = self._PIECE_MOVE_FN[ptype](self, sq, is_white, attack_moves_only)
+
+        # ----------------------- Pinned Piece Verification -----------------------
+        if validate_pin and n:
+            n = self._filter_pinned(sq, is_white, ptype == self.K,
+                                    self._move_buf, n)
+
+        return n
+
+    def _emit(self, dests: int, n: int) -> int:
+        """Append the squares of a destination bitboard to the move buffer.
 
-        # Determine side: white pieces are uppercase, black are lowercase.
-        is_white = piece.isupper()
+        Args:
+            dests: Bitboard of destination squares.
+            n: Number of squares already in ``_move_buf``.
+
+        Returns:
+            int: Number of squares in ``_move_buf`` afterwards.
+        """
+        buf = self._move_buf
+        while dests:
+            buf[n] = (dests & -dests).bit_length() - 1
+            n += 1
+            dests &= dests - 1
+        return n
 
-        # Helper function to verify a coordinate is on the board.
-        def is_inside(r: int, c: int) -> bool:
-            return 0 <= r < 8 and 0 <= c < 8
+    def _pawn_moves(self, sq: int, is_white: bool,
+                    attack_moves_only: bool) -> int:
+        """Generate pseudo-legal pawn moves into the move buffer.
 
-        # ----------------------- Pawn Moves -----------------------
-        if piece.upper() == 'P':
+        Args:
+            sq: Square index of the pawn.
+            is_white: Color of the pawn.
+            attack_moves_only: If True, skip forward moves.
+
+        Returns:
+            int: Number of destination squares written to ``_move_buf``.
+        """
+        buf = self._move_buf
+        n = 0
+        if not attack_moves_only:
             # For white pawns, they move upward (i.e. decreasing row index);
             # for black pawns, they move downward.
-            direction = -1 if is_white else 1
-            start_row = 6 if is_white else 1
+            empty = ~self.occupancy_all
+            # Move forward one.
+            push = PAWN_PUSHES[is_white][sq] & empty
+            if push:
+                push_sq = push.bit_length() - 1
+                buf[n] = push_sq
+                n += 1
+                # If on starting rank, pawn can move two squares forward.
+                if sq >> 3 == (6 if is_white else 1):
+                    push = PAWN_PUSHES[is_white][push_sq] & empty
+                    if push:
+                        buf[n] = push.bit_length() - 1
+                        n += 1
 
-            if not attack_moves_only:
-                # Move forward one.
-                forward = row + direction
-                if is_inside(forward, col) and self.board[forward][col] == '.':
-                    moves.append((forward, col))
-                    # If on starting rank, pawn can move two squares forward.
-                    if row == start_row:
-                        forward2 = row + 2 * direction
-                        if is_inside(forward2, col) and self.board[forward2][
-                            col] == '.':
-                            moves.append((forward2, col))
-
-            # Captures (diagonally).
-            for dc in [-1, 1]:
-                new_r, new_c = row + direction, col + dc
-                if is_inside(new_r, new_c):
-                    target = self.board[new_r][new_c]
-                    if target != '.' and (target.isupper() != is_white):
-                        moves.append((new_r, new_c))
-                    # Check en passant: if en_passant is set and matches the candidate square.
-                    if self.en_passant:
-                        if new_r == self.en_passant[0] and new_c == \
-                                self.en_passant[1]:
-                            moves.append((new_r, new_c))
-
-        # ----------------------- Knight Moves -----------------------
-        elif piece.upper() == 'N':
-            knight_offsets = [(2, 1), (2, -1), (-2, 1), (-2, -1),
-                              (1, 2), (1, -2), (-1, 2), (-1, -2)]
-            for dr, dc in knight_offsets:
-                new_r, new_c = row + dr, col + dc
-                if is_inside(new_r, new_c):
-                    target = self.board[new_r][new_c]
-                    if target == '.' or (target.isupper() != is_white):
-                        moves.append((new_r, new_c))
-
-        # ----------------------- Rook Moves -----------------------
-        elif piece.upper() == 'R':
-            directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-            for dr, dc in directions:
-                r, c = row, col
-                while True:
-                    r += dr
-                    c += dc
-                    if not is_inside(r, c):
-                        break
-                    target = self.board[r][c]
-                    if target == '.':
-                        moves.append((r, c))
-                    elif target.isupper() != is_white:
-                        moves.append((r, c))
-                        break
-                    else:
-                        break
-
-        # ----------------------- Bishop Moves -----------------------
-        elif piece.upper() == 'B':
-            directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-            for dr, dc in directions:
-                r, c = row, col
-                while True:
-                    r += dr
-                    c += dc
-                    if not is_inside(r, c):
-                        break
-                    target = self.board[r][c]
-                    if target == '.':
-                        moves.append((r, c))
-                    elif target.isupper() != is_white:
-                        moves.append((r, c))
-                        break
-                    else:
-                        break
-
-        # ----------------------- Queen Moves -----------------------
-        elif piece.upper() == 'Q':
-            directions = [(-1, 0), (1, 0), (0, -1), (0, 1),
-                          (-1, -1), (-1, 1), (1, -1), (1, 1)]
-            for dr, dc in directions:
-                r, c = row, col
-                while True:
-                    r += dr
-                    c += dc
-                    if not is_inside(r, c):
-                        break
-                    target = self.board[r][c]
-                    if target == '.':
-                        moves.append((r, c))
-                    elif target.isupper() != is_white:
-                        moves.append((r, c))
-                        break
-                    else:
-                        break
-
-        # ----------------------- King Moves (including castling) -----------------------
-        elif piece.upper() == 'K':
-            king_offsets = [(-1, -1), (-1, 0), (-1, 1),
-                            (0, -1), (0, 1),
-                            (1, -1), (1, 0), (1, 1)]
-            for dr, dc in king_offsets:
-                new_r, new_c = row + dr, col + dc
-                if is_inside(new_r, new_c):
-                    target = self.board[new_r][new_c]
-                    if target == '.' or (target.isupper() != is_white):
-                        moves.append((new_r, new_c))
+        # Captures (diagonally), including onto the en passant square.
+        enemy = self.occupancy_black if is_white else self.occupancy_white
+        return self._emit(PAWN_ATTACKS[is_white][sq] &
+                          (enemy | self._en_passant_bit()), n)
 
-            if not attack_moves_only:
-                # For castling, we check that the king is at its starting square.
-                if is_white and row == 7 and col == 4:
-                    # White kingside castling: squares f1 and g1 must be empty
-                    # and the rook must be at h1.
-                    if (
-                            self.castling.get('K', False) and
-                            self.board[7][5] == '.' and
-                            self.board[7][6] == '.' and
-                            self.board[7][7] == 'R' and
-                            not self.is_under_attack((7, 5), False) and
-                            not self.is_under_attack((7, 6), False)
-                    ):
-                        moves.append((7, 6))
-                    # White queenside castling: squares d1, c1, and b1 must be empty
-                    # and the rook must be at a1.
-                    if (
-                            self.castling.get('Q', False) and
-                            self.board[7][3] == '.' and
-                            self.board[7][2] == '.' and
-                            self.board[7][1] == '.' and
-                            self.board[7][0] == 'R' and
-                            not self.is_under_attack((7, 3), False) and
-                            not self.is_under_attack((7, 2), False) and
-                            not self.is_under_attack((7, 1), False)
-                    ):
-                        moves.append((7, 2))
-                elif not is_white and row == 0 and col == 4:
-                    # Black kingside castling: squares f8 and g8 must be empty and
-                    # the rook must be at h8.
-                    if (
-                            self.castling.get('k', False) and
-                            self.board[0][5] == '.' and
-                            self.board[0][6] == '.' and
-                            self.board[0][7] == 'r' and
-                            not self.is_under_attack((0, 5), True) and
-                            not self.is_under_attack((0, 6), True)
-                    ):
-                        moves.append((0, 6))
-                    # Black queenside castling: squares d8, c8, and b8 must be empty and
-                    # the rook must be at a8.
-                    if (
-                            self.castling.get('q', False) and
-                            self.board[0][3] == '.' and
-                            self.board[0][2] == '.' and
-                            self.board[0][1] == '.' and
-                            self.board[0][0] == 'r' and
-                            not self.is_under_attack((0, 3), True) and
-                            not self.is_under_attack((0, 2), True) and
-                            not self.is_under_attack((0, 1), True)
-                    ):
-                        moves.append((0, 2))
+    def _knight_moves(self, sq: int, is_white: bool,
+                      attack_moves_only: bool) -> int:
+        """Generate pseudo-legal knight moves into the move buffer.
 
-        # ----------------------- Pinned Piece Verification -----------------------
-        if validate_pin:
-            for move in moves:
-                self.make_raw_move(Move(pos, move))
-                if self.in_check(self.board[row][col].isupper()):
-                    moves.remove(move)
-                self.make_raw_move(Move(move, pos))
+        Args:
+            sq: Square index of the knight.
+            is_white: Color of the knight.
+            attack_moves_only: Unused, every knight move can capture.
+
+        Returns:
+            int: Number of destination squares written to ``_move_buf``.
+        """
+        own = self.occupancy_white if is_white else self.occupancy_black
+        return self._emit(KNIGHT_ATTACKS[sq] & ~own, 0)
 
+    def _bishop_moves(self, sq: int, is_white: bool,
+                      attack_moves_only: bool) -> int:
+        """Generate pseudo-legal bishop moves into the move buffer.
+
+        Args:
+            sq: Square index of the bishop.
+            is_white: Color of the bishop.
+            attack_moves_only: Unused, every bishop move can capture.
+
+        Returns:
+            int: Number of destination squares written to ``_move_buf``.
+        """
+        own = self.occupancy_white if is_white else self.occupancy_black
+        attacks = bishop_attacks(sq, self.occupancy_all)
+        return self._emit(attacks & ~own, 0)
+
+    def _rook_moves(self, sq: int, is_white: bool,
+                    attack_moves_only: bool) -> int:
+        """Generate pseudo-legal rook moves into the move buffer.
+
+        Args:
+            sq: Square index of the rook.
+            is_white: Color of the rook.
+            attack_moves_only: Unused, every rook move can capture.
+
+        Returns:
+            int: Number of destination squares written to ``_move_buf``.
+        """
+        own = self.occupancy_white if is_white else self.occupancy_black
+        attacks = rook_attacks(sq, self.occupancy_all)
+        return self._emit(attacks & ~own, 0)
+
+    def _queen_moves(self, sq: int, is_white: bool,
+                     attack_moves_only: bool) -> int:
+        """Generate pseudo-legal queen moves into the move buffer.
+
+        Args:
+            sq: Square index of the queen.
+            is_white: Color of the queen.
+            attack_moves_only: Unused, every queen move can capture.
+
+        Returns:
+            int: Number of destination squares written to ``_move_buf``.
+        """
+        own = self.occupancy_white if is_white else self.occupancy_black
+        occ = self.occupancy_all
+        attacks = rook_attacks(sq, occ) | bishop_attacks(sq, occ)
+        return self._emit(attacks & ~own, 0)
+
+    def _king_moves(self, sq: int, is_white: bool,
+                    attack_moves_only: bool) -> int:
+        """Generate pseudo-legal king moves, including castling.
+
+        Args:
+            sq: Square index of the king.
+            is_white: Color of the king.
+            attack_moves_only: If True, skip castling moves.
+
+        Returns:
+            int: Number of destination squares written to ``_move_buf``.
+        """
+        own = self.occupancy_white if is_white else self.occupancy_black
+        n = self._emit(KING_ATTACKS[sq] & ~own, 0)
+        if attack_moves_only:
+            return n
+
+        buf = self._move_buf
+        blocked = self.occupancy_all
+        # For castling, we check that the king is at its starting square.
+        if is_white and sq == 60:
+            blocked |= self.attacks_by(False)
+            rooks = self.bbs[self.WR]
+            # White kingside castling: squares f1 and g1 must be empty and
+            # not attacked, and the rook must be at h1.
+            if (
+                    self.castling.get('K', False) and rooks >> 63 & 1 and
+                    not blocked & (1 << 61 | 1 << 62)
+            ):
+                buf[n] = 62  # g1
+                n += 1
+            # White queenside castling: squares d1, c1, and b1 must be empty
+            # and not attacked, and the rook must be at a1.
+            if (
+                    self.castling.get('Q', False) and rooks >> 56 & 1 and
+                    not blocked & (1 << 59 | 1 << 58 | 1 << 57)
+            ):
+                buf[n] = 58  # c1
+                n += 1
+        elif not is_white and sq == 4:
+            blocked |= self.attacks_by(True)
+            rooks = self.bbs[self.BR]
+            # Black kingside castling: squares f8 and g8 must be empty and
+            # not attacked, and the rook must be at h8.
+            if (
+                    self.castling.get('k', False) and rooks >> 7 & 1 and
+                    not blocked & (1 << 5 | 1 << 6)
+            ):
+                buf[n] = 6  # g8
+                n += 1
+            # Black queenside castling: squares d8, c8, and b8 must be empty
+            # and not attacked, and the rook must be at a8.
+            if (
+                    self.castling.get('q', False) and rooks & 1 and
+                    not blocked & (1 << 3 | 1 << 2 | 1 << 1)
+            ):
+                buf[n] = 2  # c8
+                n += 1
+        return n
+
+    # Move generators indexed by piece type code.
+    _PIECE_MOVE_FN: Final[List[Optional[Callable[
+        ['Board', int, bool, bool], int]]]] = [
+        None, _pawn_moves, _knight_moves, _bishop_moves, _rook_moves,
+        _queen_moves, _king_moves
+    ]
+
+    def _filter_pinned(self, sq: int, is_white: bool, is_king: bool,
+                       dests: MutableSequence[int], n: int) -> int:
+        """Remove moves of a piece that would leave its own king in check.
+
+        The kept destinations are compacted to the front of ``dests``.
+
+        Args:
+            sq: Square index of the moving piece.
+            is_white: Color of the moving piece.
+            is_king: Whether the moving piece is the king.
+            dests: Pseudo-legal destination squares of the piece.
+            n: Number of destinations in ``dests``.
+
+        Returns:
+            int: Number of destinations that keep the king safe.
+        """
+        bbs = self.bbs
+        base = 6 if is_white else 0
+        king_sq = self.white_king_sq if is_white else self.black_king_sq
+        if king_sq < 0:
+            return n  # no king that could be left in check
+        # Without check, a non-king piece can only be pinned if it shares
+        # a line with its king and an opposing slider on that line type.
+        queens = bbs[base + self.WQ]
+        src_bit = 1 << sq
+        pinnable = (is_king or
+                    ROOK_RAYS[king_sq] & src_bit and
+                    ROOK_RAYS[king_sq] & (bbs[base + self.WR] | queens) or
+                    BISHOP_RAYS[king_sq] & src_bit and
+                    BISHOP_RAYS[king_sq] & (bbs[base + self.WB] | queens) or
+                    self.square_attacked_by(king_sq, not is_white))
+        if not pinnable:
+            return n
+
+        pos = SQUARES[sq]
+        kept = 0
+        for i in range(n):
+            dst = dests[i]
+            candidate = Move._unchecked(pos, SQUARES[dst])
+            undo = self.make_raw_move_with_undo(candidate)
+            if not self.in_check(is_white):
+                dests[kept] = dst
+                kept += 1
+            self.unmake(candidate, undo)
+        return kept
+
+    def _en_passant_bit(self) -> int:
+        """Get the en passant target square as a bitboard.
+
+        Returns:
+            int: Bitboard with the en passant square set, or 0 if none.
+        """
+        if not self.en_passant:
+            return 0
+        ep_row, ep_col = self.en_passant
+        return 1 << (ep_row * 8 + ep_col)
+
+    def _gen_pawn_moves_all(self, is_white: bool, attack_moves_only: bool
+                            ) -> Dict[int, List[int]]:
+        """Generate the pseudo-legal moves of all pawns of one side at once.
+
+        Each move type is computed for every pawn with a single shift of the
+        pawn bitboard; sources are recovered by shifting back.
+
+        Args:
+            is_white: Color of the pawns.
+            attack_moves_only: If True, only generate capturing moves.
+
+        Returns:
+            Dict[int, List[int]]: Destination squares keyed by the square
+                of each pawn.
+        """
+        pawns = self.bbs[self.WP if is_white else self.BP]
+        occ = self.occupancy_all
+        empty = ~occ & BB_ALL
+        targets = (self.occupancy_black if is_white else
+                   self.occupancy_white) | self._en_passant_bit()
+
+        # (destinations, source - destination) for each move type.
+        if is_white:
+            west = ((pawns & ~FILE_A) >> 9) & targets
+            east = ((pawns & ~FILE_H) >> 7) & targets
+            sets = [(west, 9), (east, 7)]
+            if not attack_moves_only:
+                single = (pawns >> 8) & empty
+                double = ((single & RANK_3) >> 8) & empty
+                sets = [(single, 8), (double, 16)] + sets
+        else:
+            west = ((pawns & ~FILE_A) << 7) & targets
+            east = ((pawns & ~FILE_H) << 9) & targets
+            sets = [(west, -7), (east, -9)]
+            if not attack_moves_only:
+                single = (pawns << 8) & empty
+                double = ((single & RANK_6) << 8) & empty
+                sets = [(single, -8), (double, -16)] + sets
+
+        moves: Dict[int, List[int]] = {}
+        bb = pawns
+        while bb:
+            moves[(bb & -bb).bit_length() - 1] = []
+            bb &= bb - 1
+        for dests, delta in sets:
+            while dests:
+                dst = (dests & -dests).bit_length() - 1
+                moves[dst + delta].append(dst)
+                dests &= dests - 1
         return moves
 
     def get_all_valid_moves(self, attack_moves_only: bool = False,
                             validate_pins: bool = True) -> Dict[
         Tuple[int, int], Tuple[str, List[Tuple[int, int]]]]:
-        moves = {}
-        for i in range(8):
-            for j in range(8):
-                moves[i, j] = (
-                    self.board[i][j],
-                    self.get_valid_moves(
-                        (i, j),
-                        attack_moves_only=attack_moves_only,
-                        validate_pin=validate_pins)
-                )
-        return moves
+        """Get the valid moves of every piece on the board.
+
+        Args:
+            attack_moves_only: Passed through to ``get_valid_moves``.
+            validate_pins: Passed through to ``get_valid_moves``.
+
+        Returns:
+            Dict[Tuple[int, int], Tuple[str, List[Tuple[int, int]]]]: The
+                piece character and destinations, keyed by each occupied
+                (row, col) square.
+        """
+        entry = self._tt_entry()
+        flags = (attack_moves_only, validate_pins)
+        cached = entry.moves.get(flags)
+        if cached is None:
+            cached = {}
+            buf = self._move_buf
+            # Pawns of each side are generated together.
+            for is_white in (True, False):
+                char = 'P' if is_white else 'p'
+                pawn_moves = self._gen_pawn_moves_all(is_white,
+                                                      attack_moves_only)
+                for sq, dests in pawn_moves.items():
+                    n = len(dests)
+                    if validate_pins and n:
+                        n = self._filter_pinned(sq, is_white, False, dests, n)
+                    cached[SQUARES[sq]] = (
+                        char, tuple([SQUARES[dst] for dst in dests[:n]]))
+            # Visit only occupied squares, one piece bitboard at a time.
+            for idx, char in enumerate(self.PIECE_CHARS):
+                if idx == self.WP or idx == self.BP:
+                    continue
+                code = _PIECE_FROM_CHAR[char]
+                bb = self.bbs[idx]
+                while bb:
+                    sq = (bb & -bb).bit_length() - 1
+                    bb &= bb - 1
+                    n = self._moves_from(sq, code, attack_moves_only,
+                                         validate_pins)
+                    cached[SQUARES[sq]] = (
+                        char, tuple([SQUARES[dst] for dst in buf[:n]]))
+            entry.moves[flags] = cached
+        return {pos: (piece, list(dests))
+                for pos, (piece, dests) in cached.items()}
 
     def find(self, piece: str) -> List[Tuple[int, int]]:
-        positions = []
-        for i in range(8):
-            for j in range(8):
-                if self.board[i][j] == piece:
-                    positions.append((i, j))
+        """Get the squares holding a piece, in row-major order.
+
+        Args:
+            piece: ASCII piece character, or '.' for the empty squares.
+
+        Returns:
+            List[Tuple[int, int]]: (row, col) positions of the piece, empty
+                for characters that are not pieces.
+        """
+        if piece == '.':
+            return [SQUARES[sq] for sq, code in enumerate(self.mailbox)
+                    if code == self.EMPTY]
+        idx = self.PIECE_INDEX.get(piece)
+        if idx is None:
+            return []
+        # piece_squares is unordered; sort to keep the row-major order.
+        return [SQUARES[sq] for sq in sorted(self.piece_squares[idx])]
 
-        return positions
+    def attacks_by(self, side_white: bool) -> int:
+        """Get every square attacked by one side.
+
+        The result is cached until the next call to ``make_raw_move`` and
+        kept in the transposition table for when the position recurs.
+
+        Args:
+            side_white: True for the squares attacked by white, False for
+                the squares attacked by black.
+
+        Returns:
+            int: Bitboard of the attacked squares.
+        """
+        attacks = self._attacks[side_white]
+        if attacks is not None:
+            return attacks
+        self._attacks = self._tt_entry().attacks
+        attacks = self._attacks[side_white]
+        if attacks is not None:
+            return attacks
+
+        bbs = self.bbs
+        base = 0 if side_white else 6
+        occ = self.occupancy_all
+        attacks = 0
+        for idx, table in ((self.WP, PAWN_ATTACKS[side_white]),
+                           (self.WN, KNIGHT_ATTACKS),
+                           (self.WK, KING_ATTACKS)):
+            bb = bbs[base + idx]
+            while bb:
+                attacks |= table[(bb & -bb).bit_length() - 1]
+                bb &= bb - 1
+
+        queens = bbs[base + self.WQ]
+        bb = bbs[base + self.WR] | queens
+        while bb:
+            sq = (bb & -bb).bit_length() - 1
+            attacks |= rook_attacks(sq, occ)
+            bb &= bb - 1
+        bb = bbs[base + self.WB] | queens
+        while bb:
+            sq = (bb & -bb).bit_length() - 1
+            attacks |= bishop_attacks(sq, occ)
+            bb &= bb - 1
+
+        self._attacks[side_white] = attacks
+        return attacks
+
+    def square_attacked_by(self, sq: int, by_white: bool) -> bool:
+        """Check whether any piece of one side attacks a square.
+
+        Looks outward from the square: a piece type attacks ``sq`` exactly
+        when the same piece type standing on ``sq`` would attack it, so each
+        type costs one table lookup instead of generating its moves. Uses the
+        cached attack bitboard instead when it is available.
+
+        Args:
+            sq: Square index to test.
+            by_white: True to test for white attackers, False for black.
+
+        Returns:
+            bool: True if the square is attacked.
+        """
+        attacks = self._attacks[by_white]
+        if attacks is not None:
+            return bool(attacks >> sq & 1)
+
+        bbs = self.bbs
+        base = 0 if by_white else 6
+        if KNIGHT_ATTACKS[sq] & bbs[base + self.WN] or \
+                KING_ATTACKS[sq] & bbs[base + self.WK] or \
+                PAWN_ATTACKS[not by_white][sq] & bbs[base + self.WP]:
+            return True
+        occ = self.occupancy_all
+        queens = bbs[base + self.WQ]
+        if rook_attacks(sq, occ) & (bbs[base + self.WR] | queens):
+            return True
+        return bool(bishop_attacks(sq, occ) & (bbs[base + self.WB] | queens))
 
     def is_under_attack(self, pos: Tuple[int, int],
                         white_is_attacking: bool) -> bool:
-        attacking_moves = self.get_all_valid_moves(attack_moves_only=True,
-                                                   validate_pins=False)
-        for _, v in attacking_moves.items():
-            if v[0].isupper() == white_is_attacking:
-                if pos in v[1]:
-                    return True
-        return False
+        """Check whether a side attacks a square.
+
+        A square counts as attacked whenever an attacking piece could
+        capture on it if an enemy piece stood there. Squares holding the
+        attacker's own pieces therefore count too (i.e. defended squares
+        are under attack), as do empty squares on a pawn's diagonals.
+
+        Args:
+            pos: (row, col) board position of the square.
+            white_is_attacking: True to test for white attackers, False for
+                black.
+
+        Returns:
+            bool: True if the square is attacked.
+        """
+        row, col = pos
+        return bool(self.attacks_by(white_is_attacking) >> (row * 8 + col) & 1)
 
     def in_check(self, white: bool) -> bool:
-        piece = "K" if white else "k"
-        return self.is_under_attack(self.find(piece)[0], not white)
+        king_sq = self.white_king_sq if white else self.black_king_sq
+        if king_sq < 0:
+            return False  # a side without a king is never in check
+        return self.square_attacked_by(king_sq, not white)
 
 
 if __name__ == '__main__':
+    import pprint
+
     board = Board()
     pprint.pprint(board.get_all_valid_moves())
     # board.make_raw_move(Move.from_algebraic('e2', 'e4'))
@@ -0,0 +1,199 @@
+"""Magic bitboard tables for rook and bishop attack generation.
+
+Squares are indexed ``row * 8 + col`` with square 0 at a8, matching
+``Board.bbs``. The attack set of a slider on ``sq`` given the board
+occupancy ``occ`` is looked up by ``rook_attacks`` and ``bishop_attacks``
+as::
+
+    ROOK_ATTACKS[sq][((occ & ROOK_MASK[sq]) * ROOK_MAGIC[sq]
+                      & BB_ALL) >> ROOK_SHIFT[sq]]
+
+The magic multipliers are fixed constants; the masks and attack tables are
+generated once at import by ray-filling every blocker subset.
+"""
+from typing import Final, List, Tuple
+
+BB_ALL: Final[int] = 0xFFFFFFFFFFFFFFFF
+
+ROOK_DIRECTIONS: Final[List[Tuple[int, int]]] = [
+    (-1, 0), (1, 0), (0, -1), (0, 1)]
+BISHOP_DIRECTIONS: Final[List[Tuple[int, int]]] = [
+    (-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+ROOK_MAGIC: Final[List[int]] = [
+    0x2080001440022581, 0x1080200040001080, 0x4080100008200080,
+    0x0280080080100254, 0x4D8004000A180080, 0x0100080400020100,
+    0x1080010040800200, 0x0200004402002081, 0x0068800024884004,
+    0x1000804000802002, 0x000200208A001040, 0x3008801000800800,
+    0x2006001060440A00, 0x1000800200800400, 0x0004000441024810,
+    0xA001000082004100, 0x0040808000204014, 0x0000424002201000,
+    0x0010110041002000, 0x0000090021041000, 0x0204008004800800,
+    0x0000808004000200, 0x6006040021485042, 0x0000020002409924,
+    0x2000401980028020, 0x4000400100308100, 0x0000820200201041,
+    0xB100100080800800, 0x3004080080040080, 0x0802000200041009,
+    0x01A0580400021110, 0x00020042000408A1, 0x4218884000800023,
+    0x0480201000400045, 0x0010200080801000, 0x1200200901001000,
+    0x0000100801000500, 0x0080020080800400, 0x004A000100404080,
+    0x0480005402001081, 0x258000402000C000, 0xA010004820084002,
+    0x0480200010008080, 0x244100100021000C, 0x2040080005010010,
+    0x0012000810020004, 0x0011000200B9000C, 0x1121000080410002,
+    0x00082080410A0600, 0x4002008100402600, 0x0A0300E008544100,
+    0x7B00080010008080, 0x0300080100100500, 0x0002020080040080,
+    0x0042521810214400, 0x8A00004089140200, 0x00001280010A2041,
+    0x0400401102042086, 0x41902000100C4101, 0x0043020420900009,
+    0x00E2000410082002, 0x4402000108041002, 0x2100101A00814804,
+    0x0400010400218246,
+]
+
+BISHOP_MAGIC: Final[List[int]] = [
+    0x0102040418220020, 0x0108024802002028, 0x8010044040400001,
+    0x0022209200044800, 0x4004504005040114, 0x0022010420A80800,
+    0x0008441008090002, 0x0000420801480200, 0x1100220244011C00,
+    0x00883004081AB020, 0x4400100152002000, 0x4019080841004000,
+    0x2861021210000000, 0x400EA10108400020, 0x4800208208A24000,
+    0x0020A500A0842085, 0x3410000802504400, 0x0010E0200C010060,
+    0x0014182042408200, 0x4094006840112109, 0x2014200202010000,
+    0x000100020080C400, 0x800400420D2C0200, 0x0002200182251000,
+    0x0010F10304C41000, 0x001024A008281084, 0x0088110002040100,
+    0x0820080001004008, 0x0104040020410050, 0x0110002027040500,
+    0x418C008009182100, 0x2C00A9040C80480B, 0x008110C8005020A4,
+    0x4004210802041000, 0x0004020108208100, 0x0000080800120A00,
+    0x430C008400820102, 0x1400808100020108, 0x005006020010A8A0,
+    0x000801868004A220, 0x00420105C00C2000, 0x1010921032019040,
+    0x0300222028103000, 0x0008004208001080, 0x5410202248811400,
+    0x0008010800800808, 0x3C02C20404000900, 0x0408022282040032,
+    0x0000941002100000, 0x0112209A10100804, 0x080C020111210000,
+    0x442002A442022008, 0x00084A181B040000, 0x00115021021C2080,
+    0x4010051000A20000, 0x0404688085060000, 0x0000220110011000,
+    0x140000220734200C, 0x0440010424020800, 0x2204828883460800,
+    0x0020000004050410, 0x4060004A20082080, 0x00489034B002C201,
+    0x0444049010410300,
+]
+
+
+def _relevant_mask(sq: int, directions: List[Tuple[int, int]]) -> int:
+    """Get the blocker squares that can affect a slider's attacks.
+
+    Edge squares are excluded since a blocker there never shortens a ray.
+
+    Args:
+        sq: Square index of the slider.
+        directions: (row, col) ray directions of the slider.
+
+    Returns:
+        int: Bitboard of the relevant blocker squares.
+    """
+    row, col = divmod(sq, 8)
+    mask = 0
+    for dr, dc in directions:
+        r, c = row + dr, col + dc
+        while 0 <= r + dr < 8 and 0 <= c + dc < 8:
+            mask |= 1 << (r * 8 + c)
+            r += dr
+            c += dc
+    return mask
+
+
+def _ray_attacks(sq: int, directions: List[Tuple[int, int]],
+                 occ: int) -> int:
+    """Ray-fill a slider's attacks, stopping at the first blocker per ray.
+
+    Args:
+        sq: Square index of the slider.
+        directions: (row, col) ray directions of the slider.
+        occ: Bitboard of occupied squares.
+
+    Returns:
+        int: Bitboard of attacked squares, including the blockers.
+    """
+    row, col = divmod(sq, 8)
+    attacks = 0
+    for dr, dc in directions:
+        r, c = row + dr, col + dc
+        while 0 <= r < 8 and 0 <= c < 8:
+            bit = 1 << (r * 8 + c)
+            attacks |= bit
+            if occ & bit:
+                break
+            r += dr
+            c += dc
+    return attacks
+
+
+def _build_tables(
+        directions: List[Tuple[int, int]], magics: List[int]
+) -> Tuple[List[int], List[int], List[List[int]]]:
+    """Build the masks, shifts and attack tables for one slider type.
+
+    Args:
+        directions: (row, col) ray directions of the slider.
+        magics: Magic multiplier for each square.
+
+    Returns:
+        Tuple[List[int], List[int], List[List[int]]]: Per-square relevant
+            masks, index shifts and attack tables.
+    """
+    masks, shifts, tables = [], [], []
+    for sq in range(64):
+        mask = _relevant_mask(sq, directions)
+        shift = 64 - mask.bit_count()
+        magic = magics[sq]
+        table = [0] * (1 << (64 - shift))
+        # Enumerate every subset of the mask (Carry-Rippler).
+        occ = 0
+        while True:
+            idx = (occ * magic & BB_ALL) >> shift
+            attacks = _ray_attacks(sq, directions, occ)
+            # A bad magic maps two blocker sets with different attacks to
+            # the same slot; fail here rather than generate wrong moves.
+            assert table[idx] in (0, attacks), \
+                f"magic collision on square {sq}"
+            table[idx] = attacks
+            occ = (occ - mask) & mask
+            if not occ:
+                break
+        masks.append(mask)
+        shifts.append(shift)
+        tables.append(table)
+    return masks, shifts, tables
+
+
+# Empty-board attacks, i.e. every square sharing a line with ``sq``.
+ROOK_RAYS: Final[List[int]] = [
+    _ray_attacks(sq, ROOK_DIRECTIONS, 0) for sq in range(64)]
+BISHOP_RAYS: Final[List[int]] = [
+    _ray_attacks(sq, BISHOP_DIRECTIONS, 0) for sq in range(64)]
+
+ROOK_MASK, ROOK_SHIFT, ROOK_ATTACKS = _build_tables(
+    ROOK_DIRECTIONS, ROOK_MAGIC)
+BISHOP_MASK, BISHOP_SHIFT, BISHOP_ATTACKS = _build_tables(
+    BISHOP_DIRECTIONS, BISHOP_MAGIC)
+
+
+def rook_attacks(sq: int, occ: int) -> int:
+    """Get the squares a rook attacks.
+
+    Args:
+        sq: Square index of the rook.
+        occ: Bitboard of occupied squares.
+
+    Returns:
+        int: Bitboard of attacked squares, including the blockers.
+    """
+    return ROOK_ATTACKS[sq][
+        ((occ & ROOK_MASK[sq]) * ROOK_MAGIC[sq] & BB_ALL) >> ROOK_SHIFT[sq]]
+
+
+def bishop_attacks(sq: int, occ: int) -> int:
+    """Get the squares a bishop attacks.
+
+    Args:
+        sq: Square index of the bishop.
+        occ: Bitboard of occupied squares.
+
+    Returns:
+        int: Bitboard of attacked squares, including the blockers.
+    """
+    return BISHOP_ATTACKS[sq][
+        ((occ & BISHOP_MASK[sq]) * BISHOP_MAGIC[sq] & BB_ALL)
+        >> BISHOP_SHIFT[sq]]
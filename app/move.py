@@ -41,6 +41,29 @@ class Move:
         self.target = target
         self.promotion = promotion
 
+    @classmethod
+    def _unchecked(cls: Type["Move"], source: Tuple[int, int],
+                   target: Tuple[int, int],
+                   promotion: Optional[str] = None) -> "Move":
+        """Creates a Move without validating its coordinates.
+
+        Only for internally generated moves whose squares are known to be on
+        the board; API users should go through ``__init__``.
+
+        Args:
+            source (Tuple[int, int]): Starting square given as (row, col).
+            target (Tuple[int, int]): Destination square given as (row, col).
+            promotion (Optional[str]): Optional promotion piece type.
+
+        Returns:
+            Move: A new Move instance.
+        """
+        move = cls.__new__(cls)
+        move.source = source
+        move.target = target
+        move.promotion = promotion
+        return move
+
     @classmethod
     def from_algebraic(cls: Type["Move"], source: str, target: str,
                        promotion: Optional[str] = None) -> "Move":
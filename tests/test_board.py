@@ -0,0 +1,235 @@
+"""Regression and move-count tests for ``app.board.Board``."""
+import copy
+import pickle
+import unittest
+from typing import List, Tuple
+
+from app.board import Board
+from app.move import Move
+
+
+def board_from_fen(fen: str) -> Board:
+    """Build a board from the placement, turn, castling and en passant fields
+    of a FEN string.
+
+    Args:
+        fen: FEN string; the move clock fields are optional.
+
+    Returns:
+        Board: The described position.
+    """
+    fields = fen.split()
+    position = []
+    for rank in fields[0].split('/'):
+        row: List[str] = []
+        for char in rank:
+            row.extend('.' * int(char) if char.isdigit() else char)
+        position.append(row)
+    board = Board(position)
+    board.white_turn = fields[1] == 'w'
+    board.castling = {side: side in fields[2] for side in 'KQkq'}
+    if fields[3] != '-':
+        board.en_passant = (8 - int(fields[3][1]),
+                            ord(fields[3][0]) - ord('a'))
+    return board
+
+
+def legal_moves(board: Board) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    """List the (source, target) moves of the side to move.
+
+    A promotion counts once per target square, as ``get_all_valid_moves``
+    does not list promotion pieces.
+
+    Args:
+        board: Position to generate moves in.
+
+    Returns:
+        List[Tuple[Tuple[int, int], Tuple[int, int]]]: Every move.
+    """
+    return [(src, dst)
+            for src, (piece, dests) in board.get_all_valid_moves().items()
+            if piece.isupper() == board.white_turn
+            for dst in dests]
+
+
+def perft(board: Board, depth: int) -> int:
+    """Count the leaf nodes of the move tree using raw moves.
+
+    Raw moves do not move castling rooks, capture en passant or update the
+    turn-dependent state beyond ``white_turn``, so only positions without
+    such moves before the last ply give standard perft numbers.
+
+    Args:
+        board: Position to count from; restored before returning.
+        depth: Number of plies to search.
+
+    Returns:
+        int: Number of move sequences of ``depth`` plies.
+    """
+    moves = legal_moves(board)
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for src, dst in moves:
+        move = Move(src, dst)
+        undo = board.make_raw_move_with_undo(move)
+        board.white_turn = not board.white_turn
+        nodes += perft(board, depth - 1)
+        board.white_turn = not board.white_turn
+        board.unmake(move, undo)
+    return nodes
+
+
+class TestMoveCounts(unittest.TestCase):
+
+    def test_start_position(self) -> None:
+        board = Board()
+        self.assertEqual(perft(board, 1), 20)
+        self.assertEqual(perft(board, 2), 400)
+        self.assertEqual(perft(board, 3), 8902)
+        self.assertEqual(board.board, Board().board)
+
+    def test_kiwipete(self) -> None:
+        # Pins, castling both ways and many slider interactions.
+        board = board_from_fen(
+            'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq -')
+        self.assertEqual(len(legal_moves(board)), 48)
+
+    def test_rook_endgame(self) -> None:
+        # Black's en passant replies to e2e4 and g2g4 would expose the king
+        # on the fourth rank, so raw moves, which set no en passant square,
+        # still give the standard count.
+        board = board_from_fen('8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - -')
+        self.assertEqual(perft(board, 1), 14)
+        self.assertEqual(perft(board, 2), 191)
+
+    def test_check_evasions(self) -> None:
+        board = board_from_fen(
+            'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq -')
+        self.assertEqual(len(legal_moves(board)), 6)
+
+    def test_promotions_and_castling(self) -> None:
+        # 44 legal moves, with the four d7xc8 promotions on one square.
+        board = board_from_fen(
+            'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ -')
+        self.assertEqual(len(legal_moves(board)), 41)
+
+    def test_transposition_table_reuse(self) -> None:
+        # The same position reached by two move orders shares its entry.
+        first, second = Board(), Board()
+        for board, order in ((first, ('g1f3', 'g8f6', 'b1c3', 'b8c6')),
+                             (second, ('b1c3', 'b8c6', 'g1f3', 'g8f6'))):
+            for uci in order:
+                board.make_move(Move.from_algebraic(uci[:2], uci[2:]))
+        self.assertEqual(first.zobrist_key(), second.zobrist_key())
+        self.assertEqual(first.get_all_valid_moves(),
+                         second.get_all_valid_moves())
+        self.assertEqual(len(legal_moves(first)), 24)
+
+    def test_results_are_fresh_lists(self) -> None:
+        board = Board()
+        board.get_all_valid_moves()[(6, 4)][1].clear()
+        self.assertEqual(board.get_all_valid_moves()[(6, 4)][1],
+                         [(5, 4), (4, 4)])
+
+
+class TestRegressions(unittest.TestCase):
+
+    def assertMoves(self, board: Board, pos: Tuple[int, int],
+                    expected: List[Tuple[int, int]]) -> None:
+        self.assertEqual(sorted(board.get_valid_moves(pos)), sorted(expected))
+
+    def test_generation_keeps_captured_pieces(self) -> None:
+        # Trial captures used to drop the captured piece, including kings.
+        fen = '4k3/8/8/3q4/4P3/8/8/R3K2R w KQ -'
+        board = board_from_fen(fen)
+        before = repr(board)
+        board.get_all_valid_moves()
+        board.get_valid_moves((4, 4))
+        self.assertEqual(repr(board), before)
+        self.assertEqual(board.find('k'), [(0, 4)])
+        self.assertEqual(board.zobrist_key(),
+                         board_from_fen(fen).zobrist_key())
+
+    def test_kings_adjacent_to_captures(self) -> None:
+        board = board_from_fen('8/8/8/3k4/3Pp3/8/8/4K3 b - -')
+        board.get_all_valid_moves()
+        self.assertEqual(board.find('k'), [(3, 3)])
+        self.assertEqual(board.find('K'), [(7, 4)])
+        self.assertEqual(board.find('P'), [(4, 3)])
+
+    def test_pinned_white_piece(self) -> None:
+        # Pins used to be tested against the black king only.
+        board = board_from_fen('4r1k1/8/8/8/8/8/4N3/4K3 w - -')
+        self.assertMoves(board, (6, 4), [])
+
+    def test_pinned_black_piece(self) -> None:
+        board = board_from_fen('4k3/4n3/8/8/8/8/8/4R1K1 b - -')
+        self.assertMoves(board, (1, 4), [])
+
+    def test_every_illegal_move_is_removed(self) -> None:
+        # Consecutive illegal moves used to be skipped while filtering.
+        board = board_from_fen('4r1k1/8/8/8/8/8/4R3/4K3 w - -')
+        self.assertMoves(board, (6, 4),
+                         [(5, 4), (4, 4), (3, 4), (2, 4), (1, 4), (0, 4)])
+        board = board_from_fen('4k3/8/8/8/8/8/8/r3K2R w K -')
+        self.assertMoves(board, (7, 4), [(6, 3), (6, 4), (6, 5)])
+
+    def test_halfmove_clock(self) -> None:
+        board = Board()
+        board.make_move(Move.from_algebraic('g1', 'f3'))
+        self.assertEqual(board.halfmove_clock, 1)
+        board.make_move(Move.from_algebraic('e7', 'e5'))
+        self.assertEqual(board.halfmove_clock, 0)
+        board.make_move(Move.from_algebraic('b1', 'c3'))
+        self.assertEqual(board.halfmove_clock, 1)
+        board.make_move(Move.from_algebraic('b8', 'c6'))
+        self.assertEqual(board.halfmove_clock, 2)
+        board.make_move(Move.from_algebraic('f3', 'e5'))
+        self.assertEqual(board.halfmove_clock, 0)
+
+    def test_null_raw_move(self) -> None:
+        board = Board()
+        before = repr(board)
+        move = Move((6, 4), (6, 4))
+        board.make_raw_move(move)
+        self.assertEqual(repr(board), before)
+        undo = board.make_raw_move_with_undo(move)
+        board.unmake(move, undo)
+        self.assertEqual(repr(board), before)
+        self.assertEqual(board.find('P')[4], (6, 4))
+        self.assertEqual(board.zobrist_key(), Board().zobrist_key())
+
+    def test_find(self) -> None:
+        board = Board()
+        board.make_move(Move.from_algebraic('a2', 'a4'))
+        self.assertEqual(board.find('P')[:2], [(4, 0), (6, 1)])
+        empty = board.find('.')
+        self.assertEqual(len(empty), 32)
+        self.assertEqual(empty[:2], [(2, 0), (2, 1)])
+        self.assertIn((6, 0), empty)
+        self.assertEqual(board.find('x'), [])
+
+    def test_kingless_position(self) -> None:
+        # An absent king used to be looked up as if it stood on h1.
+        board = board_from_fen('k6r/8/8/8/7N/8/8/8 w - -')
+        self.assertMoves(board, (4, 7), [(2, 6), (3, 5), (5, 5), (6, 6)])
+        board.attacks_by(False)
+        self.assertFalse(board.in_check(True))
+        self.assertFalse(board.is_under_attack((7, 7), True))
+
+    def test_copy_and_pickle(self) -> None:
+        board = Board()
+        board.make_move(Move.from_algebraic('e2', 'e4'))
+        for clone in (copy.deepcopy(board),
+                      pickle.loads(pickle.dumps(board))):
+            self.assertEqual(sorted(clone.get_valid_move_squares((0, 6))),
+                             [21, 23])
+            self.assertEqual(clone.get_all_valid_moves(),
+                             board.get_all_valid_moves())
+            clone.make_move(Move.from_algebraic('e7', 'e5'))
+            self.assertEqual(board.get(5, 'e'), '.')
+
+
+if __name__ == '__main__':
+    unittest.main()